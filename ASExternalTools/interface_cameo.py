@@ -33,6 +33,41 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
+from functools import lru_cache
+import sys
+
+@lru_cache(maxsize=8)
+def _cached_model(model):
+    '''!
+    Private function - to load a model with Cameo once per process. 
+    Loaded models are kept for subsequent calls on the same model.
+
+    @model String: Model acceptable by Cameo (see 
+    http://cameo.bio/02-import-models.html).
+    @return: Cameo model object
+    '''
+    import cameo
+    return cameo.load_model(model)
+
+def _load_model(model, modify=False):
+    '''!
+    Private function - to load a model with Cameo, re-using a 
+    previously loaded model where possible.
+
+    @model String: Model acceptable by Cameo (see 
+    http://cameo.bio/02-import-models.html).
+    @modify Boolean: Flag to indicate that the caller will change 
+    the model (such as reaction bounds or medium). If True, a copy 
+    of the loaded model is given so that the loaded model is kept 
+    unchanged. Default = False.
+    @return: Cameo model object
+    '''
+    if not isinstance(model, str):
+        import cameo
+        return cameo.load_model(model)
+    if modify:
+        return _cached_model(model).copy()
+    return _cached_model(model)
 
 def _cameo_header():
     text = '''
@@ -50,10 +85,9 @@ def get_reaction_names(model, pflag=True):
     @pflag Boolean: Flag to enable printing of results. Default = 
     True (results are printed).
     '''
-    import cameo
     _cameo_header()
     print('Load model: %s' % str(model))
-    model = cameo.load_model(model)
+    model = _load_model(model)
     print('')
     count = 1
     result = []
@@ -79,10 +113,9 @@ def get_reaction_compounds(model, pflag=True):
     @pflag Boolean: Flag to enable printing of results. Default = 
     True (results are printed).
     '''
-    import cameo
     _cameo_header()
     print('Load model: %s' % str(model))
-    model = cameo.load_model(model)
+    model = _load_model(model)
     print('')
     count = 1
     result = []
@@ -111,10 +144,9 @@ def get_medium(model, pflag=True):
     @pflag Boolean: Flag to enable printing of results. Default = 
     True (results are printed).
     '''
-    import cameo
     _cameo_header()
     print('Load model: %s' % str(model))
-    model = cameo.load_model(model)
+    model = _load_model(model)
     medium = model.medium
     print('')
     count = 1
@@ -132,7 +164,7 @@ def get_medium(model, pflag=True):
 def find_pathway(model, product, max_prediction=4):
     import cameo
     _cameo_header()
-    model = cameo.load_model(model)
+    model = _load_model(model, True)
     predictor = cameo.strain_design.pathway_prediction.PathwayPredictor(model)
     pathways = predictor.run(product=str(product), 
                              max_predictions=max_predictions)
@@ -184,14 +216,15 @@ def _fba_result(result, result_type, analysis, pflag=True):
             print('Objective value = %s' % result.objective_value)
         return result.objective_value
     elif result_type == 'flux':
-        return_result = []
-        for metabolite in result.data_frame['flux'].keys():
-            if pflag:
-                print('%s : %s' % \
-                    (metabolite, 
-                     result.data_frame['flux'][metabolite]))
-            return_result.append([metabolite, 
-                           result.data_frame['flux'][metabolite]])
+        # data_frame is rebuilt by Cameo on every access, so take the 
+        # flux column once and write the table out in a single call
+        fluxes = result.data_frame['flux']
+        return_result = [[metabolite, flux] 
+                         for (metabolite, flux) in fluxes.items()]
+        if pflag:
+            sys.stdout.write(''.join(['%s : %s\n' % (metabolite, flux)
+                                      for (metabolite, flux) 
+                                      in return_result]))
         return return_result
 
 def flux_balance_analysis(model, analysis='FBA',
@@ -212,10 +245,9 @@ def flux_balance_analysis(model, analysis='FBA',
     are objective (objective value from FBA) or flux (table of 
     fluxes).
     '''
-    import cameo
     _cameo_header()
     print('Load model: %s' % str(model))
-    model = cameo.load_model(model)
+    model = _load_model(model)
     result = _fba(model, analysis)
     result = _fba_result(result, result_type, analysis, pflag)
     return result
@@ -240,9 +272,7 @@ def _parse_mutation(mutation):
     # print(mutation)
     ndict = {}
     for m in [pair.strip() for pair in mutation.split(';')]:
-        m = [m.split(',')[0].strip(), 
-             m.split(',')[1].strip(), 
-             m.split(',')[2].strip()]
+        m = [x.strip() for x in m.split(',')[:3]]
         # print(m)
         ndict[str(m[0])] = (int(m[1]), int(m[2]))
     return ndict
@@ -295,10 +325,9 @@ def mutantFBA(model, mutation, analysis='FBA',
     are objective (objective value from FBA) or flux (table of 
     fluxes).
     '''
-    import cameo
     _cameo_header()
     print('Load model: %s' % str(model))
-    model = cameo.load_model(model)
+    model = _load_model(model, True)
     mutation = _parse_mutation(mutation)
     model = _perform_mutation(model, mutation)
     result = _fba(model, analysis)
@@ -388,10 +417,9 @@ def mediumFBA(model, change, analysis='FBA',
     are objective (objective value from FBA) or flux (table of 
     fluxes).
     '''
-    import cameo
     _cameo_header()
     print('Load model: %s' % str(model))
-    model = cameo.load_model(model)
+    model = _load_model(model, True)
     change = _parse_medium_change(change)
     model = _perform_medium_change(model, change)
     result = _fba(model, analysis)
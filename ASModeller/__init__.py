@@ -34,11 +34,20 @@ from . import model_merge
 
 from .generator_network import generateNetworkMap
 
+from .generator_ode import adaptive_solvers
+from .generator_ode import butcher_tableau
 from .generator_ode import generate_ODE
 from .generator_ode import generate_object_table
+from .generator_ode import parameterize_model
+from .generator_ode import print_compiledHeader
+from .generator_ode import print_compiledSolver
 from .generator_ode import print_header
+from .generator_ode import print_parameters
 from .generator_ode import print_rateEq
 from .generator_ode import print_Setup
+from .generator_ode import print_adaptiveSolver
+from .generator_ode import print_jacobian
+from .generator_ode import print_vectorField
 from .generator_ode import substitute_rateEq
 
 from .gsm_to_km import gsm_km_converter
@@ -51,6 +60,7 @@ from .model_access import load_initials_1
 from .model_access import load_reactions_1
 from .model_access import modelspec_reader
 from .model_access import specobj_reader
+from .model_access import specobj_raw
 from .model_access import process_asm_model
 from .model_access import process_reactions_1
 
@@ -24,9 +24,15 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
+from copy import deepcopy
+import os
 import re
 from datetime import datetime
 
+from .model_access import load_asm_objects
+from .model_access import specobj_raw
+from .model_access import specobj_reader
+
 def generate_object_table(objlist):
     '''!
     Function to generate a table of object numbering. from table 
@@ -83,19 +89,19 @@ def print_rateEq(objlist):
     '''
     printList = []
     for name in objlist:
-        rateEq_name = re.sub('\.', '_', name)
+        rateEq_name = name.replace('.', '_')
         finalTerms = [[], []]
         pTerm = 'def %s(t, y):' % rateEq_name
         printList.append(pTerm)
         for item in objlist[name].influx:
             term = objlist[name].influx[item]
-            termName = re.sub('\.', '_', item)
+            termName = item.replace('.', '_')
             pTerm = '    %s = %s' % (termName, term)
             printList.append(pTerm)
             finalTerms[0].append(termName)
         for item in objlist[name].outflux:
             term = objlist[name].outflux[item]
-            termName = re.sub('\.', '_', item)
+            termName = item.replace('.', '_')
             pTerm = '    %s = %s' % (termName, term)
             printList.append(pTerm)
             finalTerms[1].append(termName)
@@ -160,7 +166,10 @@ def print_Setup(objlist, objTable, solver='RK4',
     'CK4' (fourth order Cash-Karp), 'CK5' (fifth order Cash-Karp), 
     'RKF4' (fourth order Runge-Kutta-Fehlberg), 'RKF5' (fifth 
     order Runge-Kutta-Fehlberg), 'DP4' (fourth order Dormand-Prince), 
-    and 'DP5' (fifth order Dormand-Prince). Default = 'RK4'.  
+    'DP5' (fifth order Dormand-Prince), 'LSODA' (adaptive Adams / 
+    BDF with automatic stiffness detection), 'DOP853' (adaptive 
+    eighth order Dormand-Prince), and 'Radau' (adaptive implicit 
+    Runge-Kutta for stiff models). Default = 'RK4'.  
     @param timestep Float: Time step interval for simulation. 
     Default = 1.0.
     @param endtime Float: Time to end simulation - the simulation 
@@ -179,7 +188,8 @@ def print_Setup(objlist, objTable, solver='RK4',
     element = one line).
     '''
     # 1. Generate ode codes
-    odecode = [x[:-1] for x in open('ASModeller\\ode.py').readlines()]
+    odefile = os.path.join(os.path.dirname(__file__), 'ode.py')
+    odecode = [x[:-1] for x in open(odefile).readlines()]
     printList = odecode[8:37]
     if solver == 'Euler':
         printList = printList + odecode[37:115]
@@ -209,7 +219,7 @@ def print_Setup(objlist, objTable, solver='RK4',
     printList.append(pTerm)
     labels = ['time']
     for eqName in objTable:
-        name = re.sub('\.', '_', eqName)
+        name = eqName.replace('.', '_')
         pTerm = 'ODE[%s] = %s' % (str(objTable[eqName]), str(name))
         printList.append(pTerm)
         labels.append(name)
@@ -217,9 +227,12 @@ def print_Setup(objlist, objTable, solver='RK4',
     # 3. Generate y vector
     pTerm = 'y = list(range(%s))' % len(objlist)
     printList.append(pTerm)
+    # Initial values are converted to float, so that the model 
+    # generator writes out the start of simulation the same way as 
+    # the compiled solver
     for name in objTable:
         obj = objlist[name]
-        pTerm = 'y[%s] = %s    # %s : %s' % \
+        pTerm = 'y[%s] = float(%s)    # %s : %s' % \
             (str(objTable[name]), str(obj.value['initial']),
              str(name), str(obj.description))
         printList.append(pTerm)
@@ -247,17 +260,567 @@ def print_Setup(objlist, objTable, solver='RK4',
     pTerm = pTerm + "}"
     printList.append(pTerm)
     printList.append(' ')
-    # 6. Generate ODE execution
-    pTerm = \
-    'model = %s(ODE, 0.0, y, %s, %s, \
+    # 6. Generate ODE execution - model generator of adaptive solvers 
+    # is generated by print_adaptiveSolver() function
+    if solver in butcher_tableau:
+        pTerm = \
+        'model = %s(ODE, 0.0, y, %s, %s, \
 None, lowerbound, upperbound)' % \
-        (str(solver), str(timestep), str(endtime))
-    printList.append(pTerm)
+            (str(solver), str(timestep), str(endtime))
+        printList.append(pTerm)
+    return printList
+
+# Butcher tableaux (c, a, b) of the fixed-step solvers in ode.py - 
+# c is the time fraction of each stage, a is the stage coefficients 
+# (one list per stage), and b is the weights of the stages in the 
+# final update. Stages with zero weight in b are left out.
+butcher_tableau = {
+    'Euler': (['0'], [[]], ['1']),
+    'Heun': (['0', '1'], [[], ['1']], ['0.5', '0.5']),
+    'RK3': (['0', '0.5', '1'], 
+            [[], ['0.5'], ['-1', '2']], 
+            ['1/6.0', '4/6.0', '1/6.0']),
+    'RK4': (['0', '0.5', '0.5', '1'], 
+            [[], ['0.5'], ['0', '0.5'], ['0', '0', '1']], 
+            ['1/6.0', '2/6.0', '2/6.0', '1/6.0']),
+    'RK38': (['0', '1/3.0', '2/3.0', '1'], 
+             [[], ['1/3.0'], ['-1/3.0', '1'], ['1', '-1', '1']], 
+             ['1/8.0', '3/8.0', '3/8.0', '1/8.0']),
+    'CK4': (['0', '0.2', '0.3', '0.6', '1', '0.875'], 
+            [[], ['0.2'], ['0.075', '0.225'], ['0.3', '-0.9', '1.2'], 
+             ['-11/54.0', '2.5', '-70/27.0', '35/27.0'], 
+             ['1631/55296.0', '175/512.0', '575/13824.0', 
+              '44275/110592.0', '253/4096.0']], 
+            ['2825/27648.0', '0', '18575/48384.0', '13525/55296.0', 
+             '277/14336.0', '0.25']),
+    'CK5': (['0', '0.2', '0.3', '0.6', '1', '0.875'], 
+            [[], ['0.2'], ['0.075', '0.225'], ['0.3', '-0.9', '1.2'], 
+             ['-11/54.0', '2.5', '-70/27.0', '35/27.0'], 
+             ['1631/55296.0', '175/512.0', '575/13824.0', 
+              '44275/110592.0', '253/4096.0']], 
+            ['37/378.0', '0', '250/621.0', '125/594.0', '0', 
+             '512/1771.0']),
+    'RKF4': (['0', '0.25', '3/8.0', '12/13.0', '1'], 
+             [[], ['0.25'], ['3/32.0', '9/32.0'], 
+              ['1932/2197.0', '-7200/2197.0', '7296/2197.0'], 
+              ['439/216.0', '-8.0', '3680/513.0', '-845/4104.0']], 
+             ['25/216.0', '0', '1408/2565.0', '2197/4104.0', '-0.2']),
+    'RKF5': (['0', '0.25', '3/8.0', '12/13.0', '1', '0.5'], 
+             [[], ['0.25'], ['3/32.0', '9/32.0'], 
+              ['1932/2197.0', '-7200/2197.0', '7296/2197.0'], 
+              ['439/216.0', '-8.0', '3680/513.0', '-845/4104.0'], 
+              ['-8/27.0', '2.0', '-3544/2565.0', '1859/4104.0', 
+               '-11/40.0']], 
+             ['16/135.0', '0', '6656/12825.0', '28561/56430.0', 
+              '-9/50.0', '2/55.0']),
+    'DP4': (['0', '0.2', '0.3', '0.8', '8/9.0', '1', '1'], 
+            [[], ['0.2'], ['3/40.0', '9/40.0'], 
+             ['44/45.0', '-56/15.0', '32/9.0'], 
+             ['19372/6561.0', '-25360/2187.0', '64448/6561.0', 
+              '-212/729.0'], 
+             ['9017/3168.0', '-355/33.0', '46732/5247.0', '49/176.0', 
+              '-5103/18656.0'], 
+             ['35/384.0', '0', '500/1113.0', '125/192.0', 
+              '-2187/6784.0', '11/84.0']], 
+            ['5179/57600.0', '0', '7571/16695.0', '393/640.0', 
+             '-92097/339200.0', '187/2100.0', '1/40.0']),
+    'DP5': (['0', '0.2', '0.3', '0.8', '8/9.0', '1'], 
+            [[], ['0.2'], ['3/40.0', '9/40.0'], 
+             ['44/45.0', '-56/15.0', '32/9.0'], 
+             ['19372/6561.0', '-25360/2187.0', '64448/6561.0', 
+              '-212/729.0'], 
+             ['9017/3168.0', '-355/33.0', '46732/5247.0', '49/176.0', 
+              '-5103/18656.0']], 
+            ['35/384.0', '0', '500/1113.0', '125/192.0', 
+             '-2187/6784.0', '11/84.0'])}
+
+# Adaptive step solvers from scipy.integrate.solve_ivp, and whether 
+# the solver uses the Jacobian
+adaptive_solvers = {'LSODA': True, 
+                    'DOP853': False, 
+                    'Radau': True}
+
+def parameterize_model(spec, modelobj):
+    '''!
+    Function to generate a table of objects where the variables (in 
+    Variables stanza) with numerical values are replaced by elements 
+    of a parameter vector, p. For example, ${Variables:k1} in a rate 
+    equation becomes p[0]. This allows the compiled solver to be run 
+    with different variable values without regenerating the ODE 
+    script.
+
+    If the table of objects regenerated from the model specification 
+    does not match the given table of objects (such as for merged 
+    model objects), no variable will be replaced.
+
+    @param spec Object: ConfigParser object containing the processed 
+    model - from model_access.modelspec_reader() or 
+    model_access.specobj_reader() functions.
+    @param modelobj Dictionary: Table of objects where key is the 
+    object name and value is the object.
+    @return: A tuple of (Dictionary of parameters where key is the 
+    variable name and value is a tuple of (index in parameter vector, 
+    variable value), Dictionary of objects where key is the object 
+    name and value is the object).
+    '''
+    if spec == None or 'Variables' not in spec or 'p' in modelobj:
+        return ({}, deepcopy(modelobj))
+    rawspec = specobj_raw(spec)
+    paramTable = {}
+    for key in rawspec['Variables']:
+        try: 
+            value = float(rawspec['Variables'][key])
+        except (TypeError, ValueError): 
+            continue
+        paramTable[key] = (len(paramTable), value)
+        rawspec['Variables'][key] = 'p[%s]' % str(paramTable[key][0])
+    try:
+        objlist = load_asm_objects(specobj_reader(rawspec, 'extended'))
+    except Exception:
+        return ({}, deepcopy(modelobj))
+    if list(objlist.keys()) != list(modelobj.keys()):
+        return ({}, deepcopy(modelobj))
+    for name in modelobj:
+        if set(objlist[name].influx) != set(modelobj[name].influx) or \
+            set(objlist[name].outflux) != set(modelobj[name].outflux):
+            return ({}, deepcopy(modelobj))
+    return (paramTable, objlist)
+
+def print_parameters(paramTable, objlist, objTable):
+    '''!
+    Function to generate / print the parameter vector (params), the 
+    index of each variable in the parameter vector (param_index), and 
+    the function to generate initial values from parameter vector 
+    (initials) for the compiled solver.
+
+    @param paramTable Dictionary: Table of parameters - from 
+    parameterize_model() function.
+    @param objlist Dictionary: Table of objects - from 
+    parameterize_model() function.
+    @param objTable Dictionary: Table of objects where key is the 
+    object name and value is the object numbering.
+    @return: List of Python codes (one element = one line).
+    '''
+    values = [str(paramTable[key][1]) for key in paramTable]
+    index = ["'%s': %s" % (str(key), str(paramTable[key][0])) 
+             for key in paramTable]
+    printList = ['params = np.array([%s], dtype=np.float64)' % \
+                    ', '.join(values),
+                 'param_index = {%s}' % ', '.join(index),
+                 ' ',
+                 'def initials(p):',
+                 '    y0 = np.empty(%s)' % len(objTable)]
+    for name in objTable:
+        pTerm = '    y0[%s] = %s    # %s' % \
+            (str(objTable[name]), str(objlist[name].value['initial']),
+             str(name))
+        printList.append(pTerm)
+    printList.append('    return y0')
+    printList.append(' ')
+    return printList
+
+def _rate_table(objlist):
+    '''!
+    Private function - called by print_vectorField() and 
+    print_jacobian() functions to generate a table (dictionary) of 
+    reactions where key is the reaction ID and value is the rate 
+    equation.
+
+    @param objlist Dictionary: Table of objects where key is the 
+    object name and value is the object.
+    @return: Dictionary of rate equations.
+    '''
+    rateTable = {}
+    for name in objlist:
+        for item in objlist[name].influx:
+            rateTable[item] = objlist[name].influx[item]
+        for item in objlist[name].outflux:
+            rateTable[item] = objlist[name].outflux[item]
+    return rateTable
+
+def print_vectorField(objlist, objTable):
+    '''!
+    Function to generate the vector field function (dydt), which 
+    evaluates the derivatives of all entities in one call, from 
+    table of objects. Each reaction rate is evaluated once per call 
+    (into v vector) and the derivatives are accumulated from v by 
+    looping over a stoichiometry table (flux_entity, flux_reaction, 
+    and flux_sign) rather than one unrolled line per entity. 
+    Variables are taken from the parameter vector, p.
+
+    @param objlist Dictionary: Table of objects - from 
+    parameterize_model() function - where the rate equations have 
+    been substituted by substitute_rateEq() function.
+    @param objTable Dictionary: Table of objects where key is the 
+    object name and value is the object numbering.
+    @return: List of Python codes representing the vector field - 
+    one element is one line.
+    '''
+    rateTable = _rate_table(objlist)
+    rxnTable = generate_object_table(rateTable)
+    # Step 1: Generate stoichiometry table - one element per influx 
+    # or outflux of an entity
+    entities = []
+    reactions = []
+    signs = []
+    for name in objTable:
+        for item in objlist[name].influx:
+            entities.append(str(objTable[name]))
+            reactions.append(str(rxnTable[item]))
+            signs.append('1.0')
+        for item in objlist[name].outflux:
+            entities.append(str(objTable[name]))
+            reactions.append(str(rxnTable[item]))
+            signs.append('-1.0')
+    printList = ['flux_entity = np.array([%s], dtype=np.int64)' % \
+                    ', '.join(entities),
+                 'flux_reaction = np.array([%s], dtype=np.int64)' % \
+                    ', '.join(reactions),
+                 'flux_sign = np.array([%s], dtype=np.float64)' % \
+                    ', '.join(signs),
+                 ' ']
+    # Step 2: Generate reaction rates
+    printList = printList + ['@njit(cache=CACHE)',
+                             'def dydt(t, y, p):',
+                             '    v = np.empty(%s)' % len(rxnTable)]
+    for item in rxnTable:
+        pTerm = '    v[%s] = %s    # %s' % \
+            (str(rxnTable[item]), rateTable[item], str(item))
+        printList.append(pTerm)
+    # Step 3: Generate derivatives from stoichiometry table
+    printList = printList + \
+        ['    dy = np.zeros(%s)' % len(objTable),
+         '    for i in range(flux_entity.shape[0]):',
+         '        dy[flux_entity[i]] += flux_sign[i] * v[flux_reaction[i]]',
+         '    return dy',
+         ' ']
+    return printList
+
+def print_compiledSolver(solver='RK4', timestep=1, endtime=21600,
+                         lowerbound=[0.0, 0.0], 
+                         upperbound=[1e-3, 1e-3]):
+    '''!
+    Function to generate / print the compiled solver codes - a 
+    fixed-step Runge-Kutta stepper driven by the Butcher tableau 
+    of the solver, run_model() function which runs the whole 
+    simulation, for a given parameter vector, into a NumPy array, 
+    and run_to_end() function which only keeps the end result. 
+    The stepper and vector field are compiled with Numba when 
+    compilation is switched on (JIT = True in ODE script); otherwise, 
+    the simulation should be run using the model generator.
+
+    @param solver String: Type of solver to use. Allowable types 
+    are the keys of butcher_tableau. Default = 'RK4'.
+    @param timestep Float: Time step interval for simulation. 
+    Default = 1.0.
+    @param endtime Float: Time to end simulation - the simulation 
+    will run from 0 to end time. Default = 21600.
+    @param lowerbound List: Define lower boundary of objects. 
+    Default = [0.0, 0.0].
+    @param upperbound List: Define upper boundary of objects. 
+    Default = [1e-3, 1e-3].
+    @return: List containing the Python compiled solver codes (one 
+    element = one line).
+    '''
+    (c, a, b) = butcher_tableau[solver]
+    stages = len(b)
+    a = [row + ['0'] * (stages - len(row)) for row in a]
+    printList = ['tableau_c = np.array([%s])' % ', '.join(c),
+                 'tableau_a = np.array([%s])' % \
+                    ', '.join(['[%s]' % ', '.join(row) for row in a]),
+                 'tableau_b = np.array([%s])' % ', '.join(b),
+                 'bounds = np.array([%s, %s, %s, %s])' % \
+                    (str(lowerbound[0]), str(lowerbound[1]),
+                     str(upperbound[0]), str(upperbound[1])),
+                 ' ',
+                 '@njit(cache=CACHE)',
+                 'def step(t, y, h, p):',
+                 '    k = np.zeros((%s, y.shape[0]))' % stages,
+                 '    for s in range(%s):' % stages,
+                 '        ys = y.copy()',
+                 '        for j in range(s):',
+                 '            ys += h * tableau_a[s, j] * k[j]',
+                 '        k[s] = dydt(t + (tableau_c[s] * h), ys, p)',
+                 '    y1 = y.copy()',
+                 '    for s in range(%s):' % stages,
+                 '        y1 += h * tableau_b[s] * k[s]',
+                 '    for i in range(y1.shape[0]):',
+                 '        if y1[i] < bounds[0]: y1[i] = bounds[1]',
+                 '        if y1[i] > bounds[2]: y1[i] = bounds[3]',
+                 '    return y1',
+                 ' ',
+                 '@njit(cache=CACHE)',
+                 'def run_model(y0, p, h, tmax, sampling):',
+                 '    n_steps = 0',
+                 '    t = 0.0',
+                 '    while t < tmax:',
+                 '        t = t + h',
+                 '        n_steps = n_steps + 1',
+                 '    out = np.empty(((n_steps // sampling) + 2, ' + \
+                    'y0.shape[0] + 1))',
+                 '    t = 0.0',
+                 '    y = y0.copy()',
+                 '    out[0, 0] = t',
+                 '    out[0, 1:] = y',
+                 '    row = 1',
+                 '    for count in range(1, n_steps + 1):',
+                 '        y = step(t, y, h, p)',
+                 '        t = t + h',
+                 '        if count % sampling == 0:',
+                 '            out[row, 0] = t',
+                 '            out[row, 1:] = y',
+                 '            row = row + 1',
+                 '    out[row, 0] = t',
+                 '    out[row, 1:] = y',
+                 '    return out[:row + 1]',
+                 ' ',
+                 '@njit(cache=CACHE)',
+                 'def run_to_end(y0, p, h, tmax):',
+                 '    t = 0.0',
+                 '    y = y0.copy()',
+                 '    while t < tmax:',
+                 '        y = step(t, y, h, p)',
+                 '        t = t + h',
+                 '    out = np.empty(y0.shape[0] + 1)',
+                 '    out[0] = t',
+                 '    out[1:] = y',
+                 '    return out',
+                 ' ',
+                 'y0 = initials(params)',
+                 'timestep = %s' % str(float(timestep)),
+                 'endtime = %s' % str(float(endtime)),
+                 ' ']
     return printList
 
+def print_jacobian(objlist, objTable):
+    '''!
+    Function to generate the analytical Jacobian function (jac) of 
+    the vector field, for adaptive solvers using the Jacobian. The 
+    rate equations are differentiated using SymPy - if SymPy is not 
+    available, a rate equation cannot be differentiated, or the 
+    derivatives are not smooth (such as from max, min, or abs, which 
+    are given as conditional expressions that cannot be compiled), 
+    jac is set to None and the solver will estimate the Jacobian by 
+    finite differences.
+
+    @param objlist Dictionary: Table of objects - from 
+    parameterize_model() function - where the rate equations have 
+    been substituted by substitute_rateEq() function.
+    @param objTable Dictionary: Table of objects where key is the 
+    object name and value is the object numbering.
+    @return: List of Python codes (one element = one line).
+    '''
+    try:
+        import sympy
+        from sympy.printing.numpy import NumPyPrinter
+    except ImportError:
+        return ['jac = None', ' ']
+    rateTable = _rate_table(objlist)
+    y = [sympy.Symbol('y_%s' % str(i)) for i in range(len(objTable))]
+    symbols = dict([(str(x), x) for x in y])
+    # Step 1: Differentiate each rate equation against each entity
+    derivatives = {}
+    try:
+        for item in rateTable:
+            rateEq = re.sub(r'\b([yp])\[(\d+)\]', r'\1_\2', 
+                            rateTable[item])
+            rateEq = sympy.sympify(rateEq, locals=symbols)
+            derivatives[item] = [sympy.diff(rateEq, x) for x in y]
+    except Exception:
+        return ['jac = None', ' ']
+    # Step 1.1: Check that the derivatives only consist of arithmetic 
+    # and elementary functions
+    smooth = (sympy.Symbol, sympy.Number, sympy.NumberSymbol, 
+              sympy.Add, sympy.Mul, sympy.Pow, sympy.exp, sympy.log, 
+              sympy.sin, sympy.cos, sympy.tan, sympy.sinh, sympy.cosh, 
+              sympy.tanh)
+    for item in derivatives:
+        for term in derivatives[item]:
+            if not all([isinstance(node, smooth) 
+                        for node in sympy.preorder_traversal(term)]):
+                return ['jac = None', ' ']
+    # Step 2: Generate Jacobian from the derivatives
+    printer = NumPyPrinter()
+    printList = ['@njit(cache=CACHE)',
+                 'def jac(t, y, p):',
+                 '    J = np.zeros((%s, %s))' % (len(objTable), 
+                                                 len(objTable))]
+    for name in objTable:
+        for j in range(len(objTable)):
+            term = sum([derivatives[item][j] 
+                        for item in objlist[name].influx]) - \
+                   sum([derivatives[item][j] 
+                        for item in objlist[name].outflux])
+            if term == 0: continue
+            term = printer.doprint(term)
+            term = re.sub(r'\b([yp])_(\d+)\b', r'\1[\2]', term)
+            term = re.sub(r'\bnumpy\.', 'np.', term)
+            pTerm = '    J[%s, %s] = %s' % \
+                (str(objTable[name]), str(j), term)
+            printList.append(pTerm)
+    printList.append('    return J')
+    printList.append(' ')
+    return printList
+
+def print_adaptiveSolver(solver='LSODA', timestep=1, endtime=21600,
+                         rtol=1e-6, atol=1e-12):
+    '''!
+    Function to generate / print the adaptive solver codes - 
+    run_model() function which runs the whole simulation, for a 
+    given parameter vector, into a NumPy array using 
+    scipy.integrate.solve_ivp, run_to_end() function which only 
+    gives the end result, and the model generator (model) for 
+    running the simulation one time step at a time. The solver 
+    controls its own internal step size; time step is only used to 
+    define the time points to report. Boundaries of objects are not 
+    applied by adaptive solvers.
+
+    The model generator does not use the vector field (dydt) and 
+    Jacobian (jac), which may be compiled, but the functions of the 
+    model (ODE list), where division by zero and overflow are 
+    replaced by 1e100 as in fixed-step solvers. Hence, it can be 
+    used when the compiled functions fail. As boundaries are not 
+    applied, the solver may not be able to progress after such 
+    replacement; hence, the model generator stops with an error 
+    when the solver fails or takes more than max_steps internal 
+    steps to reach the next time step.
+
+    @param solver String: Type of solver to use. Allowable types 
+    are the keys of adaptive_solvers. Default = 'LSODA'.
+    @param timestep Float: Time step interval for reporting 
+    simulation results. Default = 1.0.
+    @param endtime Float: Time to end simulation - the simulation 
+    will run from 0 to end time. Default = 21600.
+    @param rtol Float: Relative tolerance of the solver. 
+    Default = 1e-6.
+    @param atol Float: Absolute tolerance of the solver, which should 
+    be well below the values of the objects. Default = 1e-12.
+    @return: List containing the Python adaptive solver codes (one 
+    element = one line).
+    '''
+    if adaptive_solvers[solver]:
+        jacTerm = ', jac=jac'
+    else:
+        jacTerm = ''
+    solveTerm = "solve_ivp(dydt, (0.0, t), y0, method='%s', " % solver + \
+        "t_eval=%s, args=(p,), rtol=rtol, atol=atol" + jacTerm + ")"
+    printList = ['from scipy.integrate import solve_ivp, %s' % solver,
+                 ' ',
+                 'rtol = %s' % str(float(rtol)),
+                 'atol = %s' % str(float(atol)),
+                 'max_steps = 100000',
+                 ' ',
+                 'def report_times(h, tmax, sampling):',
+                 '    n_steps = 0',
+                 '    t = 0.0',
+                 '    while t < tmax:',
+                 '        t = t + h',
+                 '        n_steps = n_steps + 1',
+                 '    steps = list(range(0, n_steps + 1, sampling))',
+                 '    times = np.array(steps + [n_steps]) * h',
+                 '    times = np.minimum(times, t)',
+                 '    times[-1] = t',
+                 '    return times',
+                 ' ',
+                 'def run_model(y0, p, h, tmax, sampling):',
+                 '    times = report_times(h, tmax, sampling)',
+                 '    t = times[-1]',
+                 '    t_eval = np.unique(times)',
+                 '    sol = %s' % (solveTerm % 't_eval'),
+                 '    if not sol.success:',
+                 '        raise RuntimeError(sol.message)',
+                 '    out = np.empty((times.shape[0], y0.shape[0] + 1))',
+                 '    out[:, 0] = times',
+                 '    out[:, 1:] = sol.y.T[np.searchsorted(t_eval, times)]',
+                 '    return out',
+                 ' ',
+                 'def run_to_end(y0, p, h, tmax):',
+                 '    t = 0.0',
+                 '    while t < tmax:',
+                 '        t = t + h',
+                 '    sol = %s' % (solveTerm % 'np.array([t])'),
+                 '    if not sol.success:',
+                 '        raise RuntimeError(sol.message)',
+                 '    out = np.empty(y0.shape[0] + 1)',
+                 '    out[0] = t',
+                 '    out[1:] = sol.y[:, -1]',
+                 '    return out',
+                 ' ',
+                 'y0 = initials(params)',
+                 'timestep = %s' % str(float(timestep)),
+                 'endtime = %s' % str(float(endtime)),
+                 ' ',
+                 'def ODE_vector(t, y):',
+                 '    y = y.tolist()',
+                 '    dy = np.empty(len(ODE))',
+                 '    for i in range(len(ODE)):',
+                 '        try: dy[i] = ODE[i](t, y)',
+                 '        except ZeroDivisionError: dy[i] = 1e100',
+                 '        except OverflowError: dy[i] = 1e100',
+                 '    return dy',
+                 ' ',
+                 'def solution():',
+                 '    times = report_times(timestep, endtime, 1)[:-1].tolist()',
+                 '    solver = %s(ODE_vector, 0.0, y0, times[-1], ' % \
+                    solver + 'rtol=rtol, atol=atol)',
+                 '    yield [0.0] + y0.tolist()',
+                 '    (i, steps) = (1, 0)',
+                 '    while i < len(times):',
+                 '        message = solver.step()',
+                 '        steps = steps + 1',
+                 "        if solver.status == 'failed':",
+                 "            raise RuntimeError('%s solver failed " % \
+                    solver + "at time %s: %s' % (solver.t, message))",
+                 '        if steps > max_steps:',
+                 "            raise RuntimeError('%s solver failed " % \
+                    solver + "at time %s: more than %s steps to ' \\",
+                 "                'reach next time step' % " + \
+                    "(solver.t, max_steps))",
+                 '        if solver.t < times[i]: continue',
+                 '        interpolate = solver.dense_output()',
+                 '        while i < len(times) and times[i] <= solver.t:',
+                 '            yield [times[i]] + interpolate(times[i]).tolist()',
+                 '            (i, steps) = (i + 1, 0)',
+                 ' ',
+                 'model = solution()',
+                 ' ']
+    return printList
+
+def print_compiledHeader():
+    '''!
+    Function to generate / print the imports for the compiled 
+    solver codes. Numba compilation is optional and only switched on 
+    when ASTOOLS_JIT environment variable is 1 and Numba is 
+    available (JIT = True); otherwise, njit decorator is replaced by 
+    a pass-through decorator. Compiled functions are cached to disk 
+    (CACHE) only when the ODE script is imported as a file, and not 
+    when it is executed from source.
+
+    @return: List of Python codes (one element = one line).
+    '''
+    return ['import os',
+            'import numpy as np',
+            '# Compilation takes a few seconds, which only pays off ' + \
+                'for long simulations',
+            'JIT = False',
+            "if os.environ.get('ASTOOLS_JIT', '0') == '1':",
+            '    try:',
+            '        from numba import njit',
+            '        JIT = True',
+            '    except ImportError:',
+            '        pass',
+            'if not JIT:',
+            '    def njit(*args, **kwargs):',
+            '        return lambda func: func',
+            '# Compiled functions can only be cached to disk when the ' + \
+                'script is imported from file',
+            "CACHE = '__file__' in globals()",
+            ' ']
+
 def generate_ODE(spec, modelobj, solver='RK4', 
                  timestep=1, endtime=21600, 
-                 lowerbound='0;0', upperbound='1e-3;1e-3'):
+                 lowerbound='0;0', upperbound='1e-3;1e-3',
+                 rtol=1e-6, atol=1e-12):
     '''!
     Function to generate Python ODE codes by wrapping up other 
     generation functions.
@@ -274,7 +837,10 @@ def generate_ODE(spec, modelobj, solver='RK4',
     'CK4' (fourth order Cash-Karp), 'CK5' (fifth order Cash-Karp), 
     'RKF4' (fourth order Runge-Kutta-Fehlberg), 'RKF5' (fifth 
     order Runge-Kutta-Fehlberg), 'DP4' (fourth order Dormand-Prince), 
-    and 'DP5' (fifth order Dormand-Prince). Default = 'RK4'.  
+    'DP5' (fifth order Dormand-Prince), 'LSODA' (adaptive Adams / 
+    BDF with automatic stiffness detection), 'DOP853' (adaptive 
+    eighth order Dormand-Prince), and 'Radau' (adaptive implicit 
+    Runge-Kutta for stiff models). Default = 'RK4'.  
     @param timestep Float: Time step interval for simulation. 
     Default = 1.0.
     @param endtime Float: Time to end simulation - the simulation 
@@ -289,10 +855,20 @@ def generate_ODE(spec, modelobj, solver='RK4',
     it will be pushed down to 9. Default = 1e-3,1e-3; that is, when 
     the value of the object above 1e-3, it will be pushed back to 
     1e-3. 
+    @param rtol Float: Relative tolerance of adaptive solvers. 
+    Default = 1e-6.
+    @param atol Float: Absolute tolerance of adaptive solvers, which 
+    should be well below the values of the objects. Default = 1e-12.
     @return: List containing the Python ODE codes (one element = 
     one line).
     '''
+    if solver not in butcher_tableau and solver not in adaptive_solvers:
+        raise ValueError('Unknown solver: %s. Allowable solvers are %s' % \
+            (str(solver), 
+             ', '.join(list(butcher_tableau) + list(adaptive_solvers))))
     objTable = generate_object_table(modelobj)
+    (paramTable, paramobj) = parameterize_model(spec, modelobj)
+    paramobj = substitute_rateEq(paramobj, objTable)
     modelobj = substitute_rateEq(modelobj, objTable)
     ODEHeader = print_header(spec)
     ODEList = print_rateEq(modelobj)
@@ -301,5 +877,19 @@ def generate_ODE(spec, modelobj, solver='RK4',
     ODESetup = print_Setup(modelobj, objTable, solver, 
                            timestep, endtime, 
                            lowerbound, upperbound)
-    datalist = ODEHeader + ODEList + ODESetup
+    ODECompiled = print_compiledHeader() + \
+        print_parameters(paramTable, paramobj, objTable) + \
+        print_vectorField(paramobj, objTable)
+    if solver in adaptive_solvers:
+        if adaptive_solvers[solver]:
+            ODECompiled = ODECompiled + \
+                print_jacobian(paramobj, objTable)
+        ODECompiled = ODECompiled + \
+            print_adaptiveSolver(solver, timestep, endtime, 
+                                 rtol, atol)
+    else:
+        ODECompiled = ODECompiled + \
+            print_compiledSolver(solver, timestep, endtime, 
+                                 lowerbound, upperbound)
+    datalist = ODEHeader + ODEList + ODESetup + [' '] + ODECompiled
     return datalist
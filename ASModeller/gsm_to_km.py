@@ -25,10 +25,9 @@ See the License for the specific language governing permissions and
 limitations under the License.
 '''
 
-import pandas as pd
-
 def gsm_km_converter(input_model, input_name, outputfile, rxnList, 
                      metabolite_initial, enzyme_conc, enzyme_kcat, enzyme_km):
+    import pandas as pd
     pd.set_option('display.max_colwidth', None)
     filenamedata = []
     filenamedata.append(outputfile)
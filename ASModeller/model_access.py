@@ -98,6 +98,25 @@ def specobj_reader(specobj, mode='extended'):
     spec.read_dict(specobj)
     return spec
 
+def specobj_raw(spec):
+    '''!
+    Function to convert a processed model specification into a 
+    dictionary-type object without interpolating the values, so that 
+    variable references (such as ${Variables:k1}) in rate equations 
+    are kept. This is the reverse of specobj_reader() function.
+
+    @param spec Object: ConfigParser object containing the processed 
+    model - from modelspec_reader() or specobj_reader() functions.
+    @return: Dictionary of sections where each section is a 
+    dictionary of keys and raw values.
+    '''
+    rawspec = {}
+    for section in spec.sections():
+        rawspec[section] = {}
+        for key in spec[section]:
+            rawspec[section][key] = spec.get(section, key, raw=True)
+    return rawspec
+
 def generate_object_list_1(spec):
     '''!
     Function to generate a table (dictionary) of objects, which 
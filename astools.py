@@ -30,24 +30,20 @@ See the License for the specific language governing permissions and
 limitations under the License.
 '''
 
-import importlib
+import argparse
+import ast
+from collections import deque
+import csv
+from functools import lru_cache
+import hashlib
+import importlib.util
+import inspect
 import pickle
 import os
-import re
 import subprocess
 import sys
-from pprint import pprint
-
-# Ensure fire is installed
-try: 
-    import fire
-except ImportError:
-    subprocess.check_call([sys.executable, '-m', 'pip', 
-                           'install', 'fire',
-                           '--trusted-host', 'pypi.org', 
-                           '--trusted-host', 'files.pythonhosted.org'])
-    import fire
-    
+from pprint import pformat
+from types import SimpleNamespace
 
 import ASExternalTools
 import ASModeller
@@ -75,9 +71,9 @@ def printASM(modelfile, readertype):
         print('readertype can only be basic or extended, %s given' \
             % readertype)
         return None
-    for section in spec.sections():
-        for item in spec[section]:
-            print('%s/%s = %s' % (section, item, spec[section][item]))
+    sys.stdout.write(''.join(['%s/%s = %s\n' % (section, item, value)
+                              for section in spec.sections()
+                              for (item, value) in spec[section].items()]))
 
 def _printASModelSpecification(spec, modelobj):
     '''!
@@ -88,22 +84,25 @@ def _printASModelSpecification(spec, modelobj):
     @param modelobj Dictionary: Dictionary of objects where key 
     is the object name and value is the object numbering.
     '''
+    results = []
     if spec != None:
-        print('-------- Model Identifiers --------')
+        results.append('-------- Model Identifiers --------')
         for key in spec['Identifiers']:
-            print('%s: %s' % (str(key), str(spec['Identifiers'][key])))
-            print('')
-    print('-------- Model Objects --------')
+            results.append('%s: %s' % (str(key), 
+                                       str(spec['Identifiers'][key])))
+            results.append('')
+    results.append('-------- Model Objects --------')
     for key in modelobj:
         obj = modelobj[key]
-        print('Name: %s' % str(obj.name))
-        print('Description: %s' % str(obj.description))
-        print('Initial: %s' % str(obj.value['initial']))
-        print('Influx:')
-        pprint(obj.influx)
-        print('Outflux:')
-        pprint(obj.outflux)
-        print('')
+        results.append('Name: %s' % str(obj.name))
+        results.append('Description: %s' % str(obj.description))
+        results.append('Initial: %s' % str(obj.value['initial']))
+        results.append('Influx:')
+        results.append(pformat(obj.influx))
+        results.append('Outflux:')
+        results.append(pformat(obj.outflux))
+        results.append('')
+    sys.stdout.write('\n'.join(results) + '\n')
 
 def readModel(modelfile, mtype='ASM'):
     '''!
@@ -132,17 +131,15 @@ def _printFluxes(modelobj):
     @param modelobj Dictionary: Dictionary of objects where key 
     is the object name and value is the object numbering.
     '''
-    results = []
+    results = ['|'.join(['Name', 'Productions', 'Usages'])]
     for key in modelobj:
         obj = modelobj[key]
         productions = '; '.join([str(k) for k in obj.influx])
         usages = '; '.join([str(k) for k in obj.outflux])
         if len(productions) == 0: productions = "NIL"
         if len(usages) == 0: usages = "NIL"
-        results.append([str(obj.name), productions, usages])
-    print('|'.join(['Name', 'Productions', 'Usages']))
-    for obj in results:
-        print('|'.join(obj))
+        results.append('|'.join([str(obj.name), productions, usages]))
+    sys.stdout.write('\n'.join(results) + '\n')
 
 def readFluxes(modelfile, mtype='ASM'):
     '''!
@@ -182,11 +179,12 @@ def generateModelObject(modelfile, outputfile, prefix='exp'):
     '''
     specList = []
     modelobjList = []
-    modelfile = [x.strip() for x in modelfile.split(';')]
+    cwd = os.getcwd()
+    modelfile = [os.path.normpath(os.path.join(cwd, x.strip()))
+                 for x in modelfile.split(';')]
     print('Input Model File(s) ...')
     count = 1
     for mf in modelfile:
-        mf = os.path.abspath(mf)
         print('ASM Model File %s: %s' % (count, mf))
         (spec, modelobj) = modelReader(mf, 'ASM', 'extended')
         specList.append(spec)
@@ -221,11 +219,12 @@ def mergeASM(modelfile, outputfile, prefix='exp'):
     '''
     specList = []
     modelobjList = []
-    modelfile = [x.strip() for x in modelfile.split(';')]
+    cwd = os.getcwd()
+    modelfile = [os.path.normpath(os.path.join(cwd, x.strip()))
+                 for x in modelfile.split(';')]
     print('Input Model File(s) ...')
     count = 1
     for mf in modelfile:
-        mf = os.path.abspath(mf)
         print('ASM Model File %s: %s' % (count, mf))
         (spec, modelobj) = modelReader(mf, 'ASM', 'basic')
         specList.append(spec)
@@ -258,11 +257,12 @@ def generateNetwork(modelfile, outputfile, outfmt='SIF'):
     Format). Default = 'SIF' (Simple Interaction Format).
     '''
     specList = []
-    modelfile = [x.strip() for x in modelfile.split(';')]
+    cwd = os.getcwd()
+    modelfile = [os.path.normpath(os.path.join(cwd, x.strip()))
+                 for x in modelfile.split(';')]
     print('Input Model File(s) ...')
     count = 1
     for mf in modelfile:
-        mf = os.path.abspath(mf)
         print('ASM Model File %s: %s' % (count, mf))
         (spec, modelobj) = modelReader(mf, 'ASM', 'extended')
         specList.append(spec)
@@ -274,8 +274,7 @@ def generateNetwork(modelfile, outputfile, outfmt='SIF'):
     outfile = open(outputfile, 'w')
     print('Output File: ' + outputfile)
     print('Output Format: ' + outfmt)
-    for line in datalist:
-        outfile.write(str(line) + '\n')
+    outfile.write(''.join(['%s\n' % str(line) for line in datalist]))
     outfile.close()
 
 def fileWriter(datalist, relativefolder, filepath):
@@ -288,11 +287,10 @@ def fileWriter(datalist, relativefolder, filepath):
     into.
     @param filepath String: Name of the file to be written into.
     '''
-    filepath = relativefolder + os.sep + filepath
+    filepath = os.path.join(relativefolder, filepath)
     filepath = os.path.abspath(filepath)
     odefile = open(filepath, 'w')
-    for line in datalist:
-        odefile.write(line + '\n')
+    odefile.write('\n'.join(datalist) + '\n')
     odefile.close()
     return filepath
 
@@ -324,11 +322,35 @@ def modelReader(modelfile, mtype, readertype='extended'):
         modelobj = loaded_data[1]
     return (spec, modelobj)
 
+def modelReaderFromSpec(spec, mtype='ASM'):
+    '''!
+    Function to read a processed model specification (already in 
+    memory) into a dictionary of objects, without reading from a 
+    model specification file.
+
+    @param spec Object: ConfigParser object containing the processed 
+    model, or model specification in dictionary format (such as 
+    'Spec' from _sensitivityModels() function).
+    @param mtype String: Type of model specification. Allowable 
+    types are 'ASM' (AdvanceSyn Model Specification). Default = 'ASM'.
+    @return: A tuple of (Object containing the processed model, 
+    Dictionary of objects where key is the object name and value is 
+    the object numbering)
+    '''
+    if isinstance(spec, dict):
+        spec = ASModeller.specobj_reader(spec, 'extended')
+    if mtype == 'ASM':
+        modelobj = ASModeller.load_asm_objects(spec)
+    else:
+        raise ValueError('Unsupported model type: %s. Only ASM model ' \
+            'specification can be read from memory' % str(mtype))
+    return (spec, modelobj)
+
 def generateODEScript(modelfile, mtype='ASM', solver='RK4', 
                       timestep=1, endtime=21600, 
                       lowerbound='0;0', 
                       upperbound='1e-3;1e-3',
-                      odefile='odescript.py'):
+                      odefile='odescript.py', rtol=1e-6, atol=1e-12):
     '''!
     Function to generate Python ODE script from a given model 
     specification file.
@@ -337,6 +359,8 @@ def generateODEScript(modelfile, mtype='ASM', solver='RK4',
 
         python astools.py genODE --modelfile=models/asm/glycolysis.modelspec --mtype=ASM --solver=RK4 --timestep=1 --endtime=21600 --lowerbound=0;0 --upperbound=1e-3;1e-3 --odefile=glycolysis.py
 
+        python astools.py genODE --modelfile=models/asm/glycolysis.modelspec --mtype=ASM --solver=LSODA --timestep=1 --endtime=21600 --rtol=1e-6 --atol=1e-12 --odefile=glycolysis.py
+
     @param modelfile String: Name of model specification file in 
     models folder. This assumes that the model file is not in models 
     folder.
@@ -349,7 +373,11 @@ def generateODEScript(modelfile, mtype='ASM', solver='RK4',
     'CK4' (fourth order Cash-Karp), 'CK5' (fifth order Cash-Karp), 
     'RKF4' (fourth order Runge-Kutta-Fehlberg), 'RKF5' (fifth 
     order Runge-Kutta-Fehlberg), 'DP4' (fourth order Dormand-Prince), 
-    and 'DP5' (fifth order Dormand-Prince). Default = 'RK4'. 
+    'DP5' (fifth order Dormand-Prince), 'LSODA' (adaptive Adams / 
+    BDF with automatic stiffness detection), 'DOP853' (adaptive 
+    eighth order Dormand-Prince), and 'Radau' (adaptive implicit 
+    Runge-Kutta for stiff models). Adaptive solvers require SciPy 
+    and do not apply boundaries. Default = 'RK4'. 
     @param timestep Float: Time step interval for simulation. 
     Default = 1.0.
     @param endtime Float: Time to end simulation - the simulation 
@@ -366,6 +394,10 @@ def generateODEScript(modelfile, mtype='ASM', solver='RK4',
     1e-3. 
     @param odefile String: Python ODE script file to write out. This 
     file will be written into odescript folder. Default = odescript.py.
+    @param rtol Float: Relative tolerance of adaptive solvers. 
+    Default = 1e-6.
+    @param atol Float: Absolute tolerance of adaptive solvers, which 
+    should be well below the values of the objects. Default = 1e-12.
     @return: A list containing the Python ODE script (one element = 
     one line).
     '''
@@ -373,18 +405,108 @@ def generateODEScript(modelfile, mtype='ASM', solver='RK4',
     (spec, modelobj) = modelReader(modelfile, mtype, 'extended')
     datalist = ASModeller.generate_ODE(spec, modelobj, solver, 
                                        timestep, endtime,
-                                       lowerbound, upperbound)
+                                       lowerbound, upperbound, 
+                                       rtol, atol)
     filepath = fileWriter(datalist, 'odescript', odefile)
     return datalist
 
-def runODEScript(odefile, sampling=100, resultfile='oderesult.csv'):
+def _switchJIT(jit):
+    '''!
+    Private function - to switch Numba compilation of the solver in 
+    ODE scripts on or off. Generated ODE scripts only compile their 
+    solver when ASTOOLS_JIT environment variable is 1 at the time 
+    they are imported, and worker processes inherit the environment.
+
+    @param jit String: Flag to determine whether to compile the 
+    solver in ODE scripts.
+    @return: True if compilation is switched on, otherwise False.
+    '''
+    jit = str(jit).upper() == 'TRUE'
+    os.environ['ASTOOLS_JIT'] = '1' if jit else '0'
+    return jit
+
+def _compiledErrors(m):
+    '''!
+    Private function - to give the errors of the compiled solver in
+    an ODE script which are handled by simulating with the model
+    generator instead. These are division by zero and overflow in
+    rate equations (which the model generator replaces by 1e100
+    before applying the boundaries), and rate equations which cannot
+    be compiled by Numba.
+
+    @param m Object: Imported Python ODE script.
+    @return: Tuple of exception classes.
+    '''
+    errors = (ZeroDivisionError, OverflowError)
+    if getattr(m, 'JIT', False):
+        from numba.core.errors import NumbaError
+        errors = errors + (NumbaError,)
+    return errors
+
+def _runCompiled(m, sampling):
+    '''!
+    Private function - to run the compiled solver in ODE script,
+    which gives the sampled rows and end result as a NumPy array.
+
+    @param m Object: Imported Python ODE script.
+    @param sampling Integer: Sampling frequency.
+    @return: NumPy array of simulation results, or None if the model
+    has to be simulated using the model generator (compilation is 
+    not switched on, Numba is not available, or the compiled solver 
+    failed).
+    '''
+    if not getattr(m, 'JIT', False):
+        return None
+    try:
+        return m.run_model(m.y0, m.params, m.timestep, m.endtime,
+                           sampling)
+    except _compiledErrors(m) as e:
+        print('Compiled solver failed (%s: %s) - using model generator' \
+              % (type(e).__name__, str(e).split('\n')[0]))
+        return None
+
+def _writeBinaryResult(m, sampling, resultfile, resultformat):
+    '''!
+    Private function - called by runODEScript() function to run the 
+    ODE model and write out the simulation results as NumPy array 
+    (npy) or HDF5 (h5) file, without converting the results into 
+    text.
+
+    @param m Object: Imported Python ODE script.
+    @param sampling Integer: Sampling frequency.
+    @param resultfile String: Absolute file path to write out 
+    simulation results.
+    @param resultformat String: Format of result file. Allowable 
+    types are 'npy' and 'h5'.
+    '''
+    import numpy as np
+    result = _runCompiled(m, sampling)
+    if result is None:
+        result = []
+        for (count, data) in enumerate(m.model):
+            if count % sampling == 0:
+                result.append(data)
+        result.append(data)
+        result = np.array(result, dtype=np.float64)
+    if resultformat == 'npy':
+        np.save(resultfile, result)
+    elif resultformat == 'h5':
+        import h5py
+        with h5py.File(resultfile, 'w') as h5file:
+            dataset = h5file.create_dataset('data', data=result, 
+                                            chunks=True, 
+                                            compression='lzf')
+            dataset.attrs['labels'] = m.labels
+
+def runODEScript(odefile, sampling=100, resultfile=None, 
+                 resultformat='csv', jit=False):
     '''!
     Function to run / execute the ODE model and write out the 
     simulation results.
 
     Usage:
 
-        python astools.py runODE --odefile=glycolysis.py --sampling=500 --resultfile=oderesult.csv
+        python astools.py runODE --odefile=glycolysis.py --sampling=500 --resultfile=oderesult.csv --resultformat=csv --jit=False
 
     @param odefile String: Python ODE script file (in odescript 
     folder) to run / execute.
@@ -393,33 +515,89 @@ def runODEScript(odefile, sampling=100, resultfile='oderesult.csv'):
     (start) and last (end) result will always be written out. 
     Default = 100.
     @param resultfile String: Relative or absolute file path to 
-    write out simulation results. Default = 'oderesult.csv' 
+    write out simulation results. For 'npy' result format, '.npy' 
+    will be added if the file path does not end with '.npy'. 
+    Default = None (oderesult.csv, oderesult.npy, or oderesult.h5, 
+    depending on result format).
+    @param resultformat String: Format of result file. Allowable 
+    types are 'csv' (comma-separated text with header), 'npy' (NumPy 
+    binary array, with columns in the same order as CSV header), and 
+    'h5' (HDF5 file, requires h5py, with the results in 'data' 
+    dataset and the column names in its 'labels' attribute). 
+    Default = 'csv'.
+    @param jit String: Flag to determine whether to compile the solver 
+    using Numba (if available). Compilation takes a few seconds on 
+    the first run of an ODE script (the compiled solver is cached to 
+    disk for later runs); hence, it only pays off for long 
+    simulations - for a small model, above about 500000 time steps 
+    on the first run and about 50000 time steps on later runs. The 
+    compiled solver adds up the rates in a different order from the 
+    model generator; hence, its results may differ in the last 
+    digits (relative difference of about 1e-14). Default = False.
+    @return: Absolute file path of the simulation results.
     '''
-    odefile = os.path.splitext(odefile)[0]
-    m = importlib.import_module('odescript.'+ odefile)
+    resultformat = str(resultformat).lower()
+    if resultformat not in ('csv', 'npy', 'h5'):
+        raise ValueError('Unknown result format: %s. Allowable ' \
+            'formats are csv, npy, and h5' % str(resultformat))
+    # Check for h5py before simulation rather than after it
+    if resultformat == 'h5' and importlib.util.find_spec('h5py') is None:
+        raise ImportError('h5py is required for h5 result format - ' \
+            'install it or use csv or npy result format')
+    if resultfile == None:
+        resultfile = 'oderesult.' + resultformat
     resultfile = os.path.abspath(resultfile)
+    # NumPy adds .npy to the file path if it is not there
+    if resultformat == 'npy' and not resultfile.endswith('.npy'):
+        resultfile = resultfile + '.npy'
+    odefile = os.path.splitext(odefile)[0]
+    _switchJIT(jit)
+    # Load ODE script from odescript folder (where generateODEScript() 
+    # writes into) without searching sys.path
+    odespec = importlib.util.spec_from_file_location('odescript.' + \
+        odefile, os.path.abspath(os.path.join('odescript', 
+                                              odefile + '.py')))
+    m = importlib.util.module_from_spec(odespec)
+    odespec.loader.exec_module(m)
     print('Executing ODE model - %s in odescript folder' % odefile)
     print('Sampling: %s' % str(int(sampling)))
     print('Output simulation result file: %s' % resultfile)
-    resultfile = open(resultfile, 'w')
-    resultfile.write(','.join(m.labels) + '\n')
     sampling = int(sampling)
-    count = 0
-    for data in m.model:
-        if count % sampling == 0:
-            data = [str(x) for x in data]
-            resultfile.write(','.join(data) + '\n')
-        count = count + 1
-    data = [str(x) for x in data]
-    resultfile.write(','.join(data) + '\n')
-    resultfile.close()
+    if resultformat in ('npy', 'h5'):
+        _writeBinaryResult(m, sampling, resultfile, resultformat)
+        return resultfile
+    result = _runCompiled(m, sampling)
+    # Large write buffer - rows are only flushed once per megabyte
+    outfile = open(resultfile, 'w', newline='', buffering=1 << 20)
+    writer = csv.writer(outfile, lineterminator='\n')
+    writer.writerow(m.labels)
+    if result is not None:
+        writer.writerows(result.tolist())
+        outfile.close()
+        return resultfile
+    # Simulation results are written out while the model generator 
+    # runs; hence, a partly written result file is removed if the 
+    # model generator fails (such as adaptive solver failing)
+    try:
+        writerow = writer.writerow
+        for (count, data) in enumerate(m.model):
+            if count % sampling == 0:
+                writerow(data)
+        writerow(data)
+    except Exception:
+        outfile.close()
+        os.remove(resultfile)
+        raise
+    outfile.close()
+    return resultfile
 
 def sensitivityGenerator(modelfile, multiple=100, 
                          prefix='', mtype='ASM'):
     '''!
     Function to generate a series of AdvanceSyn Model Specifications 
     from an existing model by multiplying a multiple to the variable 
-    in preparation for sensitivity analyses.
+    in preparation for sensitivity analyses. The generated models are 
+    written into models/temp folder.
 
     Usage:
 
@@ -435,76 +613,247 @@ def sensitivityGenerator(modelfile, multiple=100,
     specification for identification purposes. Default = ''.
     @param mtype String: Type of model specification file. Allowable 
     types are 'ASM' (AdvanceSyn Model Specification). Default = 'ASM'.
-    @return: Dictionary of file paths of generated models.
+    @return: Dictionary of generated models where key is the changed 
+    variable and value is a dictionary of file path (ASM) and changed 
+    value (Change).
+    '''
+    MSF = _sensitivityModels(modelfile, multiple, prefix, mtype, True)
+    return dict([(param, {'ASM': MSF[param]['ASM'], 
+                          'Change': MSF[param]['Change']}) 
+                 for param in MSF])
+
+def _sensitivityModels(modelfile, multiple, prefix, mtype, persist):
+    '''!
+    Private function - to generate a series of AdvanceSyn Model 
+    Specifications from an existing model by multiplying a multiple 
+    to the variable, where the generated models are kept in memory 
+    for sensitivity analyses.
+
+    @param modelfile String: Name of model specification file.
+    @param multiple Integer: Multiples to change each variable value.
+    @param prefix String: A prefixing string for the set of new model 
+    specification for identification purposes.
+    @param mtype String: Type of model specification file. Allowable 
+    types are 'ASM' (AdvanceSyn Model Specification).
+    @param persist Boolean: Flag to determine whether to write the 
+    generated models into models/temp folder. If False, the 
+    generated models are only kept in memory (as 'Spec').
+    @return: Dictionary of generated models where key is the changed 
+    variable and value is a dictionary of file path (ASM, only if 
+    persist is True), changed value (Change), and the model 
+    specification as dictionary of raw values (Spec) - generated 
+    models share all sections with the original model except 
+    Variables section.
     '''
     gModelSpecFiles = {}
     # Step 1: Process baseline model
     # Step 1.1: Process original model file 
     (bspec, modelobj) = modelReader(modelfile, mtype, 'basic')
     spec = ASModeller.specobj_reader(bspec, 'extended')
-    # Step 1.2: Process file path for original model
-    if len(modelfile.split(os.sep)) == 1:
-        filepath = modelfile.split('/')[-1]
-    else:
-        filepath = modelfile.split(os.sep)[-1]
-    filepath = os.path.splitext(filepath)[0]
-    if prefix == '':
-        filepath = os.sep.join(['models', 'temp', 
-            '%s.original.modelspec' % filepath])
-    else:
-        filepath = os.sep.join(['models', 'temp', 
-            '%s.%s.original.modelspec' % (prefix, filepath)])
+    # Step 1.2: Process file path template for models - variable 
+    # name (or original) will be filled in for each model
+    basename = os.path.splitext(os.path.basename(modelfile))[0]
+    if prefix != '':
+        basename = '%s.%s' % (prefix, basename)
+    template = os.path.abspath(os.path.join('models', 'temp', 
+                                            basename))
+    template = template + '.%s.modelspec'
     # Step 1.3: Write out original model
-    filepath = os.path.abspath(filepath)
-    tModelFile = open(filepath, 'w')
-    spec.write(tModelFile)
-    tModelFile.close()
-    # Step 1.4: Update file listings
-    gModelSpecFiles['original'] = \
-        {'ASM': os.path.abspath(filepath),
-         'Change': 'None'}
-    # Step 2: Generate models for changed parameter value 
+    rawspec = ASModeller.specobj_raw(spec)
+    gModelSpecFiles['original'] = {'Change': 'None', 
+                                   'Spec': rawspec}
+    if persist:
+        filepath = template % 'original'
+        tModelFile = open(filepath, 'w')
+        spec.write(tModelFile)
+        tModelFile.close()
+        gModelSpecFiles['original']['ASM'] = filepath
+    # Step 2: Generate models for changed parameter value - the 
+    # processed model is reused and only the changed parameter value 
+    # is updated for each new model
     for param in bspec['Variables']:
         # Step 2.1: Change parameter value 
         original_parameter = float(bspec['Variables'][param])
         new_parameter = str(original_parameter * multiple)
-        bspec.set('Variables', param, new_parameter)
-        # Step 2.2: Reprocess model to update model
-        spec = ASModeller.specobj_reader(bspec, 'extended')
-        # Step 2.3: Process file path for new model
-        if len(modelfile.split(os.sep)) == 1:
-            filepath = modelfile.split('/')[-1]
-        else:
-            filepath = modelfile.split(os.sep)[-1]
-        filepath = os.path.splitext(filepath)[0]
-        if prefix == '':
-            filepath = os.sep.join(['models', 'temp', 
-                '%s.%s.modelspec' % (filepath, param)])
-        else:
-            filepath = os.sep.join(['models', 'temp', 
-                '%s.%s.%s.modelspec' % (prefix, filepath, param)])
-        # Step 2.4: Write out as new model
-        filepath = os.path.abspath(filepath)
-        tModelFile = open(filepath, 'w')
-        spec.write(tModelFile)
-        tModelFile.close()
-        # Step 2.5: Update file listings
+        # Step 2.2: Update parameter value in processed model, and 
+        # in a copy of Variables section for in-memory model
+        spec.set('Variables', param, new_parameter)
+        pspec = dict(rawspec)
+        pspec['Variables'] = dict(rawspec['Variables'])
+        pspec['Variables'][param] = new_parameter
         gModelSpecFiles[param] = \
-            {'ASM': os.path.abspath(filepath),
-             'Change': '%s --> %s' % (str(original_parameter), 
-                                      str(new_parameter))}
+            {'Change': '%s --> %s' % (str(original_parameter), 
+                                      str(new_parameter)),
+             'Spec': pspec}
         print('Modified %s: %s --> %s' % \
             (param, str(original_parameter), str(new_parameter)))
-        print('  New ASM model in %s' % str(filepath))
-        # Step 2.6: Change back to original parameter value
-        bspec.set('Variables', param, str(original_parameter))
+        # Step 2.3: Write out as new model
+        if persist:
+            filepath = template % param
+            tModelFile = open(filepath, 'w')
+            spec.write(tModelFile)
+            tModelFile.close()
+            gModelSpecFiles[param]['ASM'] = filepath
+            print('  New ASM model in %s' % str(filepath))
+        # Step 2.4: Change back to original parameter value
+        spec.set('Variables', param, str(original_parameter))
     return gModelSpecFiles
 
+def _writeODECache(ODECode, folder):
+    '''!
+    Private function - to write ODE codes into a file named by the 
+    hash of the codes (ode_<hash>.py), unless the file has already 
+    been written. As the same ODE codes are always written into the 
+    same file, the compiled solver is cached to disk by Numba (in 
+    __pycache__ of the folder) and re-used by later analyses and by 
+    worker processes.
+
+    @param ODECode List: Python ODE codes (one element = one line) - 
+    from ASModeller.generate_ODE() function.
+    @param folder String: Absolute path of the folder to write into.
+    @return: Absolute file path of the Python ODE script.
+    '''
+    # Generation time stamp is left out so that the same model is 
+    # always written into the same file
+    ODECode = [line for line in ODECode 
+               if not line.startswith('Date Time: ')]
+    odesource = '\n'.join(ODECode) + '\n'
+    digest = hashlib.sha1(odesource.encode('utf-8')).hexdigest()
+    filepath = os.path.join(folder, 'ode_%s.py' % digest[:16])
+    if not os.path.exists(filepath):
+        os.makedirs(folder, exist_ok=True)
+        # Written into a temporary file first so that a concurrent 
+        # analysis never imports a partly written file
+        temppath = '%s.%s.tmp' % (filepath, str(os.getpid()))
+        with open(temppath, 'w') as f:
+            f.write(odesource)
+        os.replace(temppath, filepath)
+    return filepath
+
+@lru_cache(maxsize=8)
+def _importODE(odefile):
+    '''!
+    Private function - to import a generated ODE script with compiled 
+    solver from file. Imported ODE scripts are cached by their file 
+    paths; hence, models sharing the same ODE codes (differing only 
+    by parameter vector) are loaded once per process. The model 
+    generator in the imported ODE script must not be used, as it can 
+    only be run once.
+
+    @param odefile String: Absolute file path of the Python ODE script.
+    @return: Imported Python ODE script.
+    '''
+    name = os.path.splitext(os.path.basename(odefile))[0]
+    odespec = importlib.util.spec_from_file_location(name, odefile)
+    m = importlib.util.module_from_spec(odespec)
+    # Numba looks up the module by name when loading cached functions
+    sys.modules[name] = m
+    odespec.loader.exec_module(m)
+    return m
+
+def _executeODE(odesource):
+    '''!
+    Private function - to execute the source codes of a generated ODE 
+    script, without writing and importing it as a module, for 
+    simulation using the model generator. The source codes are 
+    executed for every simulation as the model generator can only be 
+    run once.
+
+    @param odesource String: Source codes of the Python ODE script.
+    @return: Namespace object of the executed ODE script.
+    '''
+    namespace = {'__name__': 'odescript'}
+    exec(compile(odesource, '<odescript>', 'exec'), namespace)
+    return SimpleNamespace(**namespace)
+
+def _simulateODE(odescript, p=None, outfmt='reduced', sampling=100):
+    '''!
+    Private function - to simulate a generated ODE script for local 
+    sensitivity analysis. This function is executed in worker 
+    processes; hence, the ODE script is given as file path or source 
+    codes.
+
+    @param odescript String: If p is given, file path of the Python 
+    ODE script (from _writeODECache() function) to simulate using the 
+    compiled solver; otherwise, source codes of the Python ODE script 
+    to simulate using the model generator.
+    @param p Object: Parameter vector for the compiled solver in the 
+    ODE script. If None, the model generator in the ODE script will 
+    be used. Default = None.
+    @param outfmt String: Output format. Allowable types are 'reduced' 
+    (only the final result) and 'full' (all data, depending on 
+    sampling). Default = 'reduced'.
+    @param sampling Integer: Sampling frequency for 'full' output 
+    format. Default = 100.
+    @return: A tuple of (labels, simulation data), or None if the 
+    compiled solver failed and the model has to be simulated using 
+    the model generator.
+    '''
+    if p is None:
+        m = _executeODE(odescript)
+    else:
+        m = _importODE(odescript)
+    simData = []
+    if p is None and outfmt == "reduced":
+        # Only the end result is kept
+        simData = [str(x) for x in deque(m.model, maxlen=1).pop()]
+    elif p is None and outfmt == "full":
+        for (count, data) in enumerate(m.model):
+            if count % sampling == 0:
+                simData.append([str(x) for x in data])
+    elif outfmt == "reduced":
+        try:
+            result = m.run_to_end(m.initials(p), p, m.timestep, 
+                                  m.endtime).tolist()
+        except _compiledErrors(m):
+            return None
+        simData = [str(x) for x in result]
+    elif outfmt == "full":
+        try:
+            result = m.run_model(m.initials(p), p, m.timestep, 
+                                 m.endtime, sampling).tolist()
+        except _compiledErrors(m):
+            return None
+        # Last row is the end result, which is not sampled
+        simData = [[str(x) for x in data] for data in result[:-1]]
+    return (m.labels, simData)
+
+def _sensitivityODE(MSF, param, solver, timestep, endtime, 
+                    rtol, atol, persist):
+    '''!
+    Private function - to generate the ODE codes of a generated model 
+    for local sensitivity analysis, which is simulated using the 
+    model generator.
+
+    @param MSF Dictionary: Generated models - from 
+    _sensitivityModels() function.
+    @param param String: Changed variable of the generated model.
+    @param solver String: Type of solver to use.
+    @param timestep Float: Time step interval for simulation.
+    @param endtime Float: Time to end simulation.
+    @param rtol Float: Relative tolerance of adaptive solvers.
+    @param atol Float: Absolute tolerance of adaptive solvers.
+    @param persist Boolean: Flag to determine whether to write the 
+    ODE codes into models/temp folder.
+    @return: Source codes of the Python ODE script.
+    '''
+    (spec, modelobj) = modelReaderFromSpec(MSF[param]['Spec'])
+    ODECode = ASModeller.generate_ODE(spec, modelobj, solver, 
+                                      timestep, endtime, '0;0', 
+                                      '1e-3;1e-3', rtol, atol)
+    if persist:
+        tempfolder = os.path.abspath(os.path.join('models', 'temp'))
+        odefile = param.replace('.', '_')
+        MSF[param]['ODE'] = fileWriter(ODECode, tempfolder, 
+                                       odefile + '.py')
+    return '\n'.join(ODECode) + '\n'
+
 def localSensitivity(modelfile, multiple=100, prefix='', 
                      mtype='ASM', solver='RK4', timestep=1, 
                      endtime=21600, cleanup=True, 
                      outfmt='reduced', sampling=100,
-                     resultfile='sensitivity_analysis.csv'):
+                     resultfile='sensitivity_analysis.csv',
+                     workers=None, rtol=1e-6, atol=1e-12, jit=False):
     '''!
     Function to perform local sensitivity analysis using OFAT/OAT 
     (one factor at a time) method where the last data time (end 
@@ -512,7 +861,7 @@ def localSensitivity(modelfile, multiple=100, prefix='',
 
     Usage:
 
-        python astools.py LSA --modelfile=models/asm/glycolysis.modelspec --prefix=sen01 --mtype=ASM --multiple=100 --solver=RK4 --timestep=1 --endtime=21600 --cleanup=True --outfmt=reduced --resultfile=sensitivity_analysis.csv
+        python astools.py LSA --modelfile=models/asm/glycolysis.modelspec --prefix=sen01 --mtype=ASM --multiple=100 --solver=RK4 --timestep=1 --endtime=21600 --cleanup=True --outfmt=reduced --resultfile=sensitivity_analysis.csv --workers=4 --jit=False
 
     @param modelfile String: Name of model specification file in 
     models folder. This assumes that the model file is not in models 
@@ -531,13 +880,20 @@ def localSensitivity(modelfile, multiple=100, prefix='',
     'CK4' (fourth order Cash-Karp), 'CK5' (fifth order Cash-Karp), 
     'RKF4' (fourth order Runge-Kutta-Fehlberg), 'RKF5' (fifth 
     order Runge-Kutta-Fehlberg), 'DP4' (fourth order Dormand-Prince), 
-    and 'DP5' (fifth order Dormand-Prince). Default = 'RK4'. 
+    'DP5' (fifth order Dormand-Prince), 'LSODA' (adaptive Adams / 
+    BDF with automatic stiffness detection), 'DOP853' (adaptive 
+    eighth order Dormand-Prince), and 'Radau' (adaptive implicit 
+    Runge-Kutta for stiff models). Adaptive solvers require SciPy 
+    and do not apply boundaries. Default = 'RK4'. 
     @param timestep Float: Time step interval for simulation. 
     Default = 1.0.
     @param endtime Float: Time to end simulation - the simulation 
     will run from 0 to end time. Default = 21600.
-    @param cleanup String: Flag to determine whether to remove all 
-    generated temporary models and ODE code files. Default = True.
+    @param cleanup String: Flag to determine whether to discard all 
+    generated temporary models and ODE code files. If True, they are 
+    only kept in memory and never written into models/temp folder; 
+    otherwise, they are written into models/temp folder for 
+    inspection. Default = True.
     @param outfmt String: Output format. Allowable types are 'reduced' 
     (only the final result will be saved into resultfile) and 'full' 
     (all data, depending on sampling, will be saved into resultfile).
@@ -547,60 +903,130 @@ def localSensitivity(modelfile, multiple=100, prefix='',
     Default = 100.
     @param resultfile String: Relative or absolute file path to 
     write out sensitivity results. Default = 'sensitivity_analysis.csv'
+    @param workers Integer: Number of processes to simulate the models 
+    in parallel. If 1, all models will be simulated in this process. 
+    Default = None (number of processors in the machine).
+    @param rtol Float: Relative tolerance of adaptive solvers. 
+    Default = 1e-6.
+    @param atol Float: Absolute tolerance of adaptive solvers, which 
+    should be well below the values of the objects. Default = 1e-12.
+    @param jit String: Flag to determine whether to compile the solver 
+    using Numba (if available), where the ODE codes of the original 
+    model are compiled once and simulated for every changed variable 
+    as a parameter vector. Compilation takes a few seconds on the 
+    first analysis of a model (the compiled solver is cached to disk 
+    for later analyses); hence, it only pays off for long simulations 
+    or models with many variables. The ODE script of the original 
+    model and its compiled solver are kept in models/jitcache folder 
+    (as ode_<hash>.py and __pycache__ folder, one script for each 
+    model and simulation settings) regardless of cleanup, and the 
+    folder can be deleted at any time to free disk space. Results of 
+    the compiled solver may differ from those of the model generator 
+    in the last digits (relative difference of about 1e-14). 
+    Default = False.
     '''
-    MSF = sensitivityGenerator(modelfile, multiple, prefix, mtype)
+    # Generated models are only written out if they are not to be 
+    # removed after the analysis
+    persist = str(cleanup).upper() != 'TRUE'
+    MSF = _sensitivityModels(modelfile, multiple, prefix, mtype, 
+                             persist)
     outfmt = str(outfmt).lower()
     sampling = int(sampling)
     resultfile = os.path.abspath(resultfile)
-    resultfile = open(resultfile, 'w')
-    header = False
     msf_count = len(MSF)
-    model_count = 0
-    for param in MSF:
-        model_count = model_count + 1
-        # Generate ODE codes from model
-        (spec, modelobj) = modelReader(MSF[param]['ASM'], 
-                                    mtype, 'extended')
+    # Step 1: Generate ODE codes from original model - the compiled 
+    # solver takes the variables as a parameter vector, so the same 
+    # ODE codes can be simulated for every changed variable. ODE codes 
+    # are imported from a file named by their hash, so that the 
+    # compiled solver is cached to disk and re-used by worker 
+    # processes and later analyses of the same model
+    compiled = _switchJIT(jit)
+    (spec, modelobj) = modelReaderFromSpec(MSF['original']['Spec'])
+    ODECode = ASModeller.generate_ODE(spec, modelobj, solver, 
+                                      timestep, endtime, '0;0', 
+                                      '1e-3;1e-3', rtol, atol)
+    osource = '\n'.join(ODECode) + '\n'
+    tempfolder = os.path.abspath(os.path.join('models', 'temp'))
+    if persist:
+        MSF['original']['ODE'] = fileWriter(ODECode, tempfolder, 
+                                            'original.py')
+    if compiled:
+        cachefolder = os.path.abspath(os.path.join('models', 'jitcache'))
+        ofile = _writeODECache(ODECode, cachefolder)
+        om = _importODE(ofile)
+        compiled = om.JIT
+    # Step 2: Simulate original model in this process first, so that 
+    # the compiled solver is compiled before starting worker 
+    # processes. If the compiled solver fails on the original model, 
+    # all models are simulated using the model generator
+    print('Processing model 1 of %s: original' % msf_count)
+    results = [None]
+    if compiled:
+        results[0] = _simulateODE(ofile, om.params.copy(), 
+                                  outfmt, sampling)
+        compiled = results[0] is not None
+    if not compiled:
+        results[0] = _simulateODE(osource, None, outfmt, sampling)
+    # Step 3: Prepare ODE codes and parameter vector for each model
+    params = [param for param in MSF if param != 'original']
+    odesources = []
+    pvectors = []
+    for param in params:
         print('Processing model %s of %s: %s' % \
-            (model_count, msf_count, MSF[param]['ASM']))
-        ODECode = ASModeller.generate_ODE(spec, modelobj, solver, 
-                 timestep, endtime)
-        odefile = re.sub('\.', '_', param)
-        filepath = fileWriter(ODECode, 'models/temp', odefile + '.py')
-        MSF[param]['ODE'] = filepath
-        # Simulate ODE codes
-        m = importlib.import_module('models.temp.'+ odefile)
-        if header == False:
-            labels = ['Parameter', 'Change'] + m.labels
-            resultfile.write(','.join(labels) + '\n')
-            header = True
-        simData = []
-        data_row_count = 0
-        for data in m.model:
-            if outfmt == "reduced":
-                simData = [str(x) for x in data]
-            elif outfmt == "full":
-                if (data_row_count % sampling) == 0:
-                    simData.append([str(x) for x in data])
-                data_row_count = data_row_count + 1
-        MSF[param]['Data'] = simData
-        # Write out sensitivity results to resultfile
+            (len(odesources) + 2, msf_count, param))
+        if compiled and param in om.param_index:
+            p = om.params.copy()
+            p[om.param_index[param]] = \
+                p[om.param_index[param]] * multiple
+            odesources.append(ofile)
+            pvectors.append(p)
+            # ODE codes are only generated to be kept for inspection
+            if persist:
+                _sensitivityODE(MSF, param, solver, timestep, endtime, 
+                                rtol, atol, persist)
+        else:
+            odesources.append(_sensitivityODE(MSF, param, solver, 
+                                              timestep, endtime, 
+                                              rtol, atol, persist))
+            pvectors.append(None)
+    # Step 4: Simulate models
+    count = len(odesources)
+    if workers == 1:
+        results = results + \
+            list(map(_simulateODE, odesources, pvectors, 
+                     [outfmt] * count, [sampling] * count))
+    elif count > 0:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = results + \
+                list(executor.map(_simulateODE, odesources, 
+                                  pvectors, [outfmt] * count, 
+                                  [sampling] * count))
+    # Step 5: Simulate models where the compiled solver failed (such 
+    # as division by zero in rate equations) using the model 
+    # generator of their own ODE codes
+    for index in range(count):
+        if results[index + 1] is None:
+            param = params[index]
+            print('Compiled solver failed for %s - using model generator' \
+                  % param)
+            odesource = _sensitivityODE(MSF, param, solver, timestep, 
+                                        endtime, rtol, atol, persist)
+            results[index + 1] = _simulateODE(odesource, None, 
+                                              outfmt, sampling)
+    # Step 6: Write out sensitivity results to resultfile
+    resultfile = open(resultfile, 'w', newline='', buffering=1 << 20)
+    writer = csv.writer(resultfile, lineterminator='\n')
+    writer.writerow(['Parameter', 'Change'] + results[0][0])
+    for (param, result) in zip(MSF, results):
+        MSF[param]['Data'] = result[1]
+        rowhead = [param, MSF[param]['Change']]
         if outfmt == "reduced":
-            data = [param, MSF[param]['Change']] + MSF[param]['Data']
-            data = [str(x) for x in data]
-            resultfile.write(','.join(data) + '\n')
+            writer.writerow(rowhead + MSF[param]['Data'])
         elif outfmt == "full":
-            for datarow in MSF[param]['Data']:
-                data = [param, MSF[param]['Change']] + datarow
-                data = [str(x) for x in data]
-                resultfile.write(','.join(data) + '\n')
+            writer.writerows([rowhead + datarow 
+                              for datarow in MSF[param]['Data']])
     resultfile.close()
-    if str(cleanup).upper() == 'TRUE':
-        for param in MSF:
-            ASMfile = MSF[param]['ASM']
-            ODEfile = MSF[param]['ODE']
-            os.remove(ASMfile)
-            os.remove(ODEfile)
 
 def systemData():
     print('Welcome to AdvanceSyn Toolkit')
@@ -673,11 +1099,10 @@ def cameo_FBA(model, result_type='objective', library=False):
     addition to printing on scree. Default = False.
     '''
     import cameo
+    result = ASExternalTools.flux_balance_analysis(model, 'FBA',
+                                                   result_type)
     if library:
-        return ASExternalTools.flux_balance_analysis(model, 'FBA', 
-                                                     result_type)
-    else: 
-        ASExternalTools.flux_balance_analysis(model, 'FBA', result_type)
+        return result
 
 def cameo_pFBA(model, result_type='objective', library=False):
     '''!
@@ -705,11 +1130,10 @@ def cameo_pFBA(model, result_type='objective', library=False):
     addition to printing on scree. Default = False.
     '''
     import cameo
+    result = ASExternalTools.flux_balance_analysis(model, 'pFBA',
+                                                   result_type)
     if library:
-        return ASExternalTools.flux_balance_analysis(model, 'pFBA', 
-                                                     result_type)
-    else:
-        ASExternalTools.flux_balance_analysis(model, 'pFBA', result_type)
+        return result
     
 def cameo_reactionNames(model, library=False):
     '''!
@@ -726,10 +1150,9 @@ def cameo_reactionNames(model, library=False):
     addition to printing on scree. Default = False.
     '''
     import cameo
+    result = ASExternalTools.get_reaction_names(model)
     if library:
-        return ASExternalTools.get_reaction_names(model)
-    else:
-        ASExternalTools.get_reaction_names(model)
+        return result
 
 def cameo_reactionCompounds(model, library=False):
     '''!
@@ -747,10 +1170,9 @@ def cameo_reactionCompounds(model, library=False):
     addition to printing on scree. Default = False.
     '''
     import cameo
+    result = ASExternalTools.get_reaction_compounds(model)
     if library:
-        return ASExternalTools.get_reaction_compounds(model)
-    else:
-        ASExternalTools.get_reaction_compounds(model)
+        return result
 
 def cameo_mutantFBA(model, mutation, result_type='objective',
                     library=False):
@@ -776,11 +1198,10 @@ def cameo_mutantFBA(model, mutation, result_type='objective',
     addition to printing on scree. Default = False.
     '''
     import cameo
+    result = ASExternalTools.mutantFBA(model, mutation, 'FBA',
+                                       result_type)
     if library:
-        return ASExternalTools.mutantFBA(model, mutation, 'FBA', 
-                                         result_type)
-    else:
-        ASExternalTools.mutantFBA(model, mutation, 'FBA', result_type)
+        return result
 
 def cameo_mutantpFBA(model, mutation, result_type='objective',
                      library=False):
@@ -813,11 +1234,10 @@ def cameo_mutantpFBA(model, mutation, result_type='objective',
     addition to printing on scree. Default = False.
     '''
     import cameo
+    result = ASExternalTools.mutantFBA(model, mutation, 'pFBA',
+                                       result_type)
     if library:
-        return ASExternalTools.mutantFBA(model, mutation, 'pFBA', 
-                                         result_type)
-    else:
-        ASExternalTools.mutantFBA(model, mutation, 'pFBA', result_type)
+        return result
 
 def cameo_medium(model, library=False):
     '''!
@@ -834,10 +1254,9 @@ def cameo_medium(model, library=False):
     addition to printing on scree. Default = False.
     '''
     import cameo
+    result = ASExternalTools.get_medium(model)
     if library:
-        return ASExternalTools.get_medium(model)
-    else:
-        ASExternalTools.get_medium(model)
+        return result
 
 def cameo_mediumFBA(model, change, result_type='objective', 
                     library=False):
@@ -863,10 +1282,10 @@ def cameo_mediumFBA(model, change, result_type='objective',
     addition to printing on scree. Default = False.
     '''
     import cameo
+    result = ASExternalTools.mediumFBA(model, change, 'FBA',
+                                       result_type)
     if library:
-        return ASExternalTools.mediumFBA(model, change, 'FBA', result_type)
-    else:
-        ASExternalTools.mediumFBA(model, change, 'FBA', result_type)
+        return result
 
 def cameo_mediumpFBA(model, change, result_type='objective', 
                      library=False):
@@ -899,10 +1318,10 @@ def cameo_mediumpFBA(model, change, result_type='objective',
     addition to printing on scree. Default = False.
     '''
     import cameo
+    result = ASExternalTools.mediumFBA(model, change, 'pFBA',
+                                       result_type)
     if library:
-        return ASExternalTools.mediumFBA(model, change, 'pFBA', result_type)
-    else:
-        ASExternalTools.mediumFBA(model, change, 'pFBA', result_type)
+        return result
 
 def GSM_to_ASM(model, name, outputfile, metabolite_initial=1e-5, 
                enzyme_conc=1e-6, enzyme_kcat=13.7, enzyme_km=130e-6):
@@ -930,6 +1349,82 @@ def GSM_to_ASM(model, name, outputfile, metabolite_initial=1e-5,
     return rxnList
 
 
+def _parseValue(value):
+    '''!
+    Private function - to convert a command line value into Python 
+    value. Python literals (such as 100, 1e-3, True, None) are 
+    converted into their values; other values (such as file paths 
+    or 0;0) are kept as strings.
+
+    @param value String: Command line value.
+    @return: Converted value.
+    '''
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+def _build_parser(commands):
+    '''!
+    Private function - to generate the command line parser, where 
+    each command is a sub-command and each parameter of the function 
+    is an option (such as --modelfile). Parameters without default 
+    value are required options.
+
+    @param commands Dictionary: Table of commands where key is the 
+    command name and value is the function.
+    @return: argparse.ArgumentParser object.
+    '''
+    parser = argparse.ArgumentParser(prog='astools.py', 
+        description='AdvanceSyn Toolkit')
+    subparsers = parser.add_subparsers(dest='command', 
+                                       metavar='command')
+    for name in commands:
+        function = commands[name]
+        doc = inspect.getdoc(function)
+        if doc == None: doc = ''
+        doc = doc.lstrip('!').strip()
+        summary = ' '.join(doc.split('\n\n')[0].split())
+        subparser = subparsers.add_parser(name, 
+            help=summary.replace('%', '%%'), description=doc, 
+            formatter_class=argparse.RawDescriptionHelpFormatter)
+        for param in inspect.signature(function).parameters.values():
+            flags = ['--%s' % param.name]
+            if '_' in param.name:
+                flags.append('--%s' % param.name.replace('_', '-'))
+            if param.default is inspect.Parameter.empty:
+                subparser.add_argument(*flags, dest=param.name, 
+                                       type=_parseValue, 
+                                       required=True)
+            elif isinstance(param.default, bool):
+                # Flag without value (such as --library) means True
+                subparser.add_argument(*flags, dest=param.name, 
+                    type=_parseValue, nargs='?', const=True, 
+                    default=param.default, 
+                    help=('Default = %s' % param.default))
+            else:
+                subparser.add_argument(*flags, dest=param.name, 
+                    type=_parseValue, default=param.default, 
+                    help=('Default = %s' % 
+                          str(param.default).replace('%', '%%')))
+    return parser
+
+def _printResult(result):
+    '''!
+    Private function - to print out the returned value of a command.
+
+    @param result Object: Returned value of the command.
+    '''
+    if result == None:
+        return
+    elif isinstance(result, (list, tuple)):
+        sys.stdout.write(''.join(['%s\n' % str(x) for x in result]))
+    elif isinstance(result, dict):
+        sys.stdout.write(''.join(['%s: %s\n' % (str(k), str(result[k])) 
+                                  for k in result]))
+    else:
+        print(result)
+
 if __name__ == '__main__':
     astools_functions = {'genMO': generateModelObject,
                          'genNetwork': generateNetwork,
@@ -956,4 +1451,14 @@ if __name__ == '__main__':
                        'cameo-rxn-names': cameo_reactionNames}
     exposed_functions = {**astools_functions, 
                          **cameo_functions}
-    fire.Fire(exposed_functions)
+    commands = exposed_functions
+    if len(sys.argv) > 1 and sys.argv[1] in exposed_functions:
+        # Only the requested command is needed to parse its options
+        commands = {sys.argv[1]: exposed_functions[sys.argv[1]]}
+    parser = _build_parser(commands)
+    args = vars(parser.parse_args())
+    command = args.pop('command')
+    if command == None:
+        parser.print_help()
+    else:
+        _printResult(exposed_functions[command](**args))